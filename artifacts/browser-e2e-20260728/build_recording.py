@@ -1,29 +1,20 @@
+"""Rebuild this directory's e2e recording with the shared tools/build_recording.py."""
+import sys
 from pathlib import Path
 
-from PIL import Image, ImageOps
-
 
 OUTPUT_DIR = Path(__file__).parent
-frames = []
+sys.path.insert(0, str(OUTPUT_DIR.parents[1] / "tools"))
 
-for path in sorted(OUTPUT_DIR.glob("[0-9][0-9]-*.png")):
-    with Image.open(path) as source:
-        frame = ImageOps.contain(source.convert("RGB"), (1280, 720))
-        canvas = Image.new("RGB", (1280, 720), "#111827")
-        canvas.paste(
-            frame,
-            ((canvas.width - frame.width) // 2, (canvas.height - frame.height) // 2),
-        )
-        frames.append(canvas)
+import build_recording  # noqa: E402
 
-if not frames:
-    raise SystemExit("No browser frames found.")
 
-frames[0].save(
-    OUTPUT_DIR / "haasib-umrah-e2e-recording.gif",
-    save_all=True,
-    append_images=frames[1:],
-    duration=1400,
-    loop=0,
-    optimize=True,
-)
+if __name__ == "__main__":
+    build_recording.main(
+        [
+            str(OUTPUT_DIR),
+            "--pattern", "[0-9][0-9]-*.png",
+            "--output", str(OUTPUT_DIR / "haasib-umrah-e2e-recording.gif"),
+            *sys.argv[1:],
+        ]
+    )
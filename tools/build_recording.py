@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Recording Builder — Turn a directory of screenshots into an animated recording.
+
+What it does
+- Letterboxes every screenshot onto a fixed-size canvas in a process pool
+- Caches letterboxed frames by content hash, so a rebuild only renders new screenshots
+- Folds consecutive identical frames into one longer frame
+- Writes GIF (streamed frame by frame as changed rectangles), animated WebP or APNG
+
+Usage
+  python tools/build_recording.py tests-e2e/screenshots
+  python tools/build_recording.py artifacts/browser-e2e-20260728 \
+    --pattern '[0-9][0-9]-*.png' --output recording.webp --duration 1400
+
+Per-frame durations
+- Pass --durations file.json (or drop durations.json next to the screenshots)
+  mapping screenshot file names to milliseconds, e.g. {"01-dashboard.png": 3000}.
+  Frames not listed use --duration.
+
+Dependencies
+- pillow (pip install pillow)
+
+Notes
+- The output format follows the --output suffix (.gif, .webp, .png/.apng) unless --format is given.
+- WebP is lossy at --quality 90 by default: typically a quarter of the GIF size with
+  sharp UI text. Use --lossless for pixel-exact frames.
+- GIF and WebP frames are handed to the encoder one at a time. APNG goes through
+  Pillow's APNG writer, which needs every frame in memory, so it is refused above
+  APNG_MAX_FRAMES screenshots; use GIF or WebP for longer runs.
+- Output goes to a temp file next to the target and replaces it only once the build succeeds.
+- The output and its temp files are never picked up as frames; without --output, neither
+  are earlier default outputs (recording.gif/.webp/.png/.apng), and skipping one is reported.
+- Cache: tools/.cache/recording by default (--cache-dir, or --no-cache to disable).
+"""
+from __future__ import annotations
+import argparse, hashlib, io, json, os, sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import GifImagePlugin, Image, ImageChops, ImageOps, _webp
+
+FORMATS = {'.gif': 'gif', '.webp': 'webp', '.png': 'apng', '.apng': 'apng'}
+SUFFIXES = {'gif': '.gif', 'webp': '.webp', 'apng': '.png'}
+DEFAULT_CACHE_DIR = Path(__file__).parent / '.cache' / 'recording'
+APNG_MAX_FRAMES = 100
+# GIF stores delays as 16-bit centiseconds
+MAX_DURATION_MS = 655_350
+
+def parse_size(text: str) -> tuple[int, int]:
+    try:
+        width, height = (int(v) for v in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected WIDTHxHEIGHT, got {text!r}')
+    if width < 1 or height < 1:
+        raise argparse.ArgumentTypeError(f'size must be positive, got {text!r}')
+    return width, height
+
+def cache_key(data: bytes, size: tuple[int, int], background: str) -> str:
+    digest = hashlib.sha256(data)
+    digest.update(f'{size[0]}x{size[1]}:{background}'.encode())
+    return digest.hexdigest()
+
+def render_frame(path: Path, size: tuple[int, int], background: str, cache_dir: Path | None) -> bytes:
+    data = path.read_bytes()
+    cached = cache_dir / f'{cache_key(data, size, background)}.png' if cache_dir else None
+    if cached and cached.exists():
+        with Image.open(cached) as image:
+            return image.convert('RGB').tobytes()
+
+    with Image.open(io.BytesIO(data)) as source:
+        frame = ImageOps.contain(source.convert('RGB'), size)
+    canvas = Image.new('RGB', size, background)
+    canvas.paste(
+        frame,
+        ((canvas.width - frame.width) // 2, (canvas.height - frame.height) // 2),
+    )
+    if cached:
+        # Write-then-rename so concurrent builds never read a half-written frame
+        tmp = cached.with_name(f'{cached.name}.{os.getpid()}.tmp')
+        canvas.save(tmp, 'PNG', compress_level=1)
+        os.replace(tmp, cached)
+    return canvas.tobytes()
+
+def encode_gif_frame(raw: bytes, size: tuple[int, int], offset: tuple[int, int], duration: int, first: bool) -> bytes:
+    image = Image.frombytes('RGB', size, raw).quantize(colors=256)
+    chunks: list[bytes] = []
+    if first:
+        header, _ = GifImagePlugin.getheader(image, info={'loop': 0})
+        chunks.extend(header)
+    chunks.extend(GifImagePlugin.getdata(image, offset, duration=duration, disposal=1, include_color_table=True))
+    return b''.join(chunks)
+
+def ordered_map(executor, fn, jobs, window: int):
+    """Yield ``fn(*job)`` results in order with at most ``window`` jobs pending."""
+    pending = deque()
+    for job in jobs:
+        pending.append(executor.submit(fn, *job))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def unique_frames(canvases, durations, size: tuple[int, int]):
+    """Yield (canvas, duration), folding consecutive identical canvases together."""
+    held = None
+    for raw, duration in zip(canvases, durations):
+        canvas = Image.frombytes('RGB', size, raw)
+        if held and ImageChops.difference(held[0], canvas).getbbox() is None:
+            held[1] = min(held[1] + duration, MAX_DURATION_MS)
+            continue
+        if held:
+            yield tuple(held)
+        held = [canvas, duration]
+    if held:
+        yield tuple(held)
+
+def gif_jobs(frames):
+    """Turn full frames into encode jobs covering only the rectangle that changed."""
+    previous = None
+    for canvas, duration in frames:
+        if previous is None:
+            yield canvas.tobytes(), canvas.size, (0, 0), duration, True
+        else:
+            bbox = ImageChops.difference(previous, canvas).getbbox()
+            crop = canvas.crop(bbox)
+            yield crop.tobytes(), crop.size, bbox[:2], duration, False
+        previous = canvas
+
+def temp_output(output: Path) -> Path:
+    # Sibling temp file, moved over the output on success so a failed build never clobbers the last good recording
+    return output.with_name(f'{output.name}.{os.getpid()}.tmp')
+
+def write_gif(executor, frames, output: Path, window: int) -> None:
+    tmp = temp_output(output)
+    try:
+        with tmp.open('wb') as fp:
+            for chunk in ordered_map(executor, encode_gif_frame, gif_jobs(frames), window):
+                fp.write(chunk)
+            fp.write(b';')
+        os.replace(tmp, output)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def write_webp(frames, output: Path, size: tuple[int, int], quality: int, lossless: bool) -> None:
+    # Pillow's save() wants the whole sequence up front; its encoder takes one frame at a time
+    kmin, kmax = (9, 17) if lossless else (3, 5)  # gif2webp defaults, as in Pillow
+    method = 4
+    enc = _webp.WebPAnimEncoder(size, 0, 0, False, kmin, kmax, False, False)
+    timestamp = 0
+    for canvas, duration in frames:
+        enc.add(canvas.getim(), timestamp, lossless, quality, 100, method)
+        timestamp += duration
+    enc.add(None, timestamp, lossless, quality, 100, 0)
+    data = enc.assemble(b'', b'', b'')
+    if data is None:
+        raise OSError('cannot write file as WebP (encoder returned None)')
+
+    tmp = temp_output(output)
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, output)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def write_apng(frames, output: Path) -> None:
+    images, durations = [], []
+    for canvas, duration in frames:
+        images.append(canvas)
+        durations.append(duration)
+    tmp = temp_output(output)
+    try:
+        images[0].save(tmp, format='PNG', save_all=True, append_images=images[1:], duration=durations, loop=0, optimize=True)
+        os.replace(tmp, output)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def load_durations(path: Path | None, names: list[str], default: int) -> list[int]:
+    overrides: dict = {}
+    if path:
+        try:
+            overrides = json.loads(path.read_text())
+        except json.JSONDecodeError as e:
+            raise SystemExit(f'{path}: invalid JSON ({e})')
+        if not isinstance(overrides, dict):
+            raise SystemExit(f'{path}: expected an object mapping file names to milliseconds')
+        for name, value in overrides.items():
+            if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= MAX_DURATION_MS:
+                raise SystemExit(f'{path}: duration for {name!r} must be an integer from 1 to {MAX_DURATION_MS} ms, got {value!r}')
+        unknown = sorted(set(overrides) - set(names))
+        if unknown:
+            print(f"Ignoring durations for unknown frames: {', '.join(unknown)}", file=sys.stderr)
+    return [overrides.get(name, default) for name in names]
+
+def parse_args(argv: list[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description='Build an animated recording from a screenshot directory.')
+    p.add_argument('input_dir', type=Path, help='directory containing the screenshots')
+    p.add_argument('--pattern', default='*.png', help="glob for frames, sorted by name (default: '*.png')")
+    p.add_argument('--output', '-o', type=Path, help='output file (default: <input_dir>/recording.<format>)')
+    p.add_argument('--format', choices=sorted(SUFFIXES), help='output format (default: from --output suffix, else gif)')
+    p.add_argument('--size', type=parse_size, default=(1280, 720), help='canvas WIDTHxHEIGHT (default: 1280x720)')
+    p.add_argument('--background', default='#111827', help='letterbox colour (default: #111827)')
+    p.add_argument('--duration', type=int, default=1400, help='default frame duration in ms (default: 1400)')
+    p.add_argument('--durations', type=Path, help='JSON map of file name -> ms (default: <input_dir>/durations.json if present)')
+    p.add_argument('--quality', type=int, default=90, help='WebP quality 0-100 (default: 90)')
+    p.add_argument('--lossless', action='store_true', help='lossless WebP')
+    p.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR, help='resized frame cache directory')
+    p.add_argument('--no-cache', action='store_true', help='do not read or write the frame cache')
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes (default: CPU count)')
+    args = p.parse_args(argv)
+
+    if args.workers < 1:
+        p.error('--workers must be at least 1')
+    if not 1 <= args.duration <= MAX_DURATION_MS:
+        p.error(f'--duration must be between 1 and {MAX_DURATION_MS} ms')
+    if not 0 <= args.quality <= 100:
+        p.error('--quality must be between 0 and 100')
+    suffix_format = FORMATS.get(args.output.suffix.lower()) if args.output else None
+    if args.format and suffix_format and args.format != suffix_format:
+        p.error(f'--format {args.format} does not match output suffix {args.output.suffix!r}')
+    if args.format is None:
+        args.format = suffix_format or 'gif'
+    args.default_output = args.output is None
+    if args.default_output:
+        args.output = args.input_dir / f'recording{SUFFIXES[args.format]}'
+    if args.durations is None and (args.input_dir / 'durations.json').exists():
+        args.durations = args.input_dir / 'durations.json'
+    return args
+
+def is_output(path: Path, output: Path, default_output: bool) -> bool:
+    """True for the output, its temp files and, when --output was not given, earlier default outputs."""
+    if path.parent.resolve() == output.parent.resolve():
+        if path.name == output.name or (path.name.startswith(f'{output.name}.') and path.suffix == '.tmp'):
+            return True
+    if default_output and path.stem == 'recording' and path.suffix.lower() in FORMATS:
+        print(f'Skipping earlier recording {path}', file=sys.stderr)
+        return True
+    return False
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    paths = sorted(
+        path for path in args.input_dir.glob(args.pattern)
+        if path.is_file() and not is_output(path, args.output, args.default_output)
+    )
+    if not paths:
+        raise SystemExit(f'No frames matching {args.pattern!r} in {args.input_dir}.')
+    if args.format == 'apng' and len(paths) > APNG_MAX_FRAMES:
+        raise SystemExit(f'APNG output keeps every frame in memory; {len(paths)} screenshots exceed '
+                         f'the {APNG_MAX_FRAMES}-frame limit. Use .webp or .gif instead.')
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    if cache_dir:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    durations = load_durations(args.durations, [path.name for path in paths], args.duration)
+    # Frames in flight per stage; this, not the frame count, bounds memory.
+    window = args.workers * 2
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        jobs = ((path, args.size, args.background, cache_dir) for path in paths)
+        canvases = ordered_map(executor, render_frame, jobs, window)
+        frames = unique_frames(canvases, durations, args.size)
+        if args.format == 'gif':
+            write_gif(executor, frames, args.output, window)
+        elif args.format == 'webp':
+            write_webp(frames, args.output, args.size, args.quality, args.lossless)
+        else:
+            write_apng(frames, args.output)
+
+    print(f'Wrote {args.output} ({len(paths)} screenshots, {args.output.stat().st_size / 1024:.0f} KiB)')
+
+if __name__ == '__main__':
+    main()
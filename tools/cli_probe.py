@@ -10,10 +10,13 @@ Notes:
   - Requires a superadmin user to authenticate.
   - Creates temporary users/companies and cleans them up.
   - Prints a concise report (action, ok, status, ms, message/errors).
+  - Streams counters and latency histograms via tools/metrics.py
+    (tools/reports/metrics/cli_probe_<run>.prom while running + JSONL; see METRICS_DIR).
 """
 from __future__ import annotations
 import os, sys, time, uuid, json, typing as t
 import requests
+from metrics import Metrics
 
 BASE_URL = os.environ.get("BASE_URL", "http://127.0.0.1:8000")
 EMAIL = os.environ.get("LOGIN_EMAIL")
@@ -24,6 +27,7 @@ if not EMAIL or not PASSWORD:
     sys.exit(2)
 
 S = requests.Session()
+M = Metrics('cli_probe')
 
 def url(p: str) -> str:
     return BASE_URL.rstrip('/') + p
@@ -47,8 +51,15 @@ def login(email: str, password: str) -> None:
 def post_command(action: str, params: dict) -> tuple[dict, int, float]:
     headers = {'X-Action': action, 'X-Idempotency-Key': str(uuid.uuid4()), **xsrf_header()}
     t0 = time.perf_counter()
-    r = S.post(url('/commands'), json=params, headers=headers)
+    try:
+        r = S.post(url('/commands'), json=params, headers=headers)
+    except requests.RequestException:
+        M.inc('commands_total', action=action, status='error')
+        M.observe('command_duration_seconds', time.perf_counter() - t0, action=action)
+        raise
     dt = (time.perf_counter() - t0) * 1000.0
+    M.inc('commands_total', action=action, status=str(r.status_code))
+    M.observe('command_duration_seconds', dt / 1000.0, action=action)
     try:
         body = r.json()
     except Exception:
@@ -83,6 +94,7 @@ def main() -> None:
             for k, v in errs.items():
                 first = v[0] if isinstance(v, list) and v else v
                 details.append(f"{k}: {first}")
+        M.inc('steps_total', step=action, ok=str(ok).lower())
 
         report.append({
             'action': action,
@@ -7,6 +7,7 @@ What it does
 - Exercises /commands with realistic scenarios (create, assign, unassign, delete)
 - Verifies side-effects via web lookups (/web/companies, /web/users, ...)
 - Measures latency per step and emits a JSON + Markdown report
+- Streams counters and latency histograms via tools/metrics.py while it runs
 
 Usage
   BASE_URL=http://127.0.0.1:8000 \
@@ -21,10 +22,12 @@ Dependencies
 Outputs
 - tools/reports/cli_suite_<timestamp>.json
 - tools/reports/cli_suite_<timestamp>.md
+- tools/reports/metrics/cli_suite_<run>.prom while running (+ cli_suite_<timestamp>_<run>.jsonl; see METRICS_DIR)
 """
 from __future__ import annotations
 import os, sys, time, json, uuid, pathlib, typing as t
 import requests
+from metrics import Metrics
 
 BASE_URL = os.environ.get('BASE_URL', 'http://127.0.0.1:8000')
 LOGIN_EMAIL = os.environ.get('LOGIN_EMAIL')
@@ -35,6 +38,7 @@ if not LOGIN_EMAIL or not LOGIN_PASSWORD:
     sys.exit(2)
 
 S = requests.Session()
+M = Metrics('cli_suite')
 
 def U(p: str) -> str:
     return BASE_URL.rstrip('/') + p
@@ -55,8 +59,15 @@ def login(email: str, password: str) -> None:
 def post_command(action: str, params: dict, idem_key: str | None = None) -> tuple[dict, int, float]:
     headers = {'X-Action': action, 'X-Idempotency-Key': idem_key or str(uuid.uuid4()), **xsrf()}
     t0 = time.perf_counter()
-    r = S.post(U('/commands'), json=params, headers=headers)
+    try:
+        r = S.post(U('/commands'), json=params, headers=headers)
+    except requests.RequestException:
+        M.inc('commands_total', action=action, status='error')
+        M.observe('command_duration_seconds', time.perf_counter() - t0, action=action)
+        raise
     dt = (time.perf_counter() - t0) * 1000.0
+    M.inc('commands_total', action=action, status=str(r.status_code))
+    M.observe('command_duration_seconds', dt / 1000.0, action=action)
     try:
         body = r.json()
     except Exception:
@@ -82,6 +93,10 @@ def main() -> None:
 
     results: list[dict] = []
 
+    def add(entry: dict):
+        results.append(entry)
+        M.inc('steps_total', step=entry['action'], ok=str(entry['ok']).lower())
+
     def record(action: str, params: dict, status: int, ms: float, body: dict):
         ok = 200 <= status < 300 and (body.get('ok', True) is not False)
         entry = {
@@ -92,7 +107,7 @@ def main() -> None:
             'message': body.get('message') or body.get('error') or ('ok' if ok else 'failed'),
             'errors': body.get('errors') or {},
         }
-        results.append(entry)
+        add(entry)
 
     # 1) user.create with password
     body, status, ms = post_command('user.create', {'name': 'Suite User', 'email': user_email, 'password': 'secret123'})
@@ -113,14 +128,14 @@ def main() -> None:
     # Verify membership via lookups
     if company_id:
         users = get_json(f'/web/companies/{company_id}/users', params={'q': user_email, 'limit': 1}).get('data', [])
-        results.append({'action': 'verify.membership', 'ok': any(u.get('email') == user_email for u in users), 'status': 200, 'ms': 0.0, 'message': 'membership verified'})
+        add({'action': 'verify.membership', 'ok': any(u.get('email') == user_email for u in users), 'status': 200, 'ms': 0.0, 'message': 'membership verified'})
 
     # 4) idempotency replay should 409
     idem = str(uuid.uuid4())
     _b1, s1, ms1 = post_command('company.create', {'name': company_name + '-dup'}, idem)
     _b2, s2, ms2 = post_command('company.create', {'name': company_name + '-dup'}, idem)
-    results.append({'action': 'idempotency.1st', 'ok': 200 <= s1 < 300, 'status': s1, 'ms': round(ms1, 1), 'message': 'first ok'})
-    results.append({'action': 'idempotency.replay', 'ok': s2 == 409, 'status': s2, 'ms': round(ms2, 1), 'message': 'replay 409'})
+    add({'action': 'idempotency.1st', 'ok': 200 <= s1 < 300, 'status': s1, 'ms': round(ms1, 1), 'message': 'first ok'})
+    add({'action': 'idempotency.replay', 'ok': s2 == 409, 'status': s2, 'ms': round(ms2, 1), 'message': 'replay 409'})
 
     # 5) negative assign non-existent user -> 422 with explicit error
     body, status, ms = post_command('company.assign', {'email': f'missing+{uid}@example.com', 'company': company_id or company_name, 'role': 'admin'})
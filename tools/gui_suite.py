@@ -7,6 +7,8 @@ What it does
 - Opens the command palette from the dock "Open" button
 - Runs a few freeform commands and validates visible UI state
 - Measures timings and emits a concise console report
+- Streams step counters and timing histograms via tools/metrics.py
+  (tools/reports/metrics/gui_suite_<run>.prom while running + JSONL; see METRICS_DIR)
 
 Usage
   BASE_URL=http://127.0.0.1:8000 \
@@ -24,9 +26,10 @@ Notes
 - This suite does not clean up created entities; pair with tools/cli_suite.py for cleanup.
 """
 from __future__ import annotations
-import os, sys, time, uuid, json
+import os, sys, uuid, json
 from contextlib import contextmanager
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+from metrics import Metrics
 
 BASE_URL = os.environ.get('BASE_URL', 'http://127.0.0.1:8000')
 LOGIN_EMAIL = os.environ.get('LOGIN_EMAIL')
@@ -37,13 +40,21 @@ if not LOGIN_EMAIL or not LOGIN_PASSWORD:
     print('Set LOGIN_EMAIL and LOGIN_PASSWORD env vars', file=sys.stderr)
     sys.exit(2)
 
+M = Metrics('gui_suite')
+
 def U(p: str) -> str:
     return BASE_URL.rstrip('/') + p
 
 @contextmanager
-def timer():
-    t0 = time.perf_counter()
-    yield lambda: (time.perf_counter() - t0) * 1000.0
+def step(name: str):
+    """Time a step and count its outcome, including failures that abort the run."""
+    with M.time('step_duration_seconds', step=name) as t:
+        try:
+            yield t
+        except Exception:
+            M.inc('steps_total', step=name, ok='false')
+            raise
+    M.inc('steps_total', step=name, ok='true')
 
 def main() -> None:
     report = []
@@ -56,7 +67,7 @@ def main() -> None:
         page = ctx.new_page()
 
         # Login
-        with timer() as t:
+        with step('login') as t:
             page.goto(U('/login'))
             page.get_by_label('Email').fill(LOGIN_EMAIL)
             page.get_by_label('Password').fill(LOGIN_PASSWORD)
@@ -66,14 +77,14 @@ def main() -> None:
         report.append({'step': 'login', 'ms': round(t(),1), 'ok': True})
 
         # Open palette via dock Open button (more robust than keyboard globally)
-        with timer() as t:
+        with step('open_palette') as t:
             page.wait_for_selector('button[title^="Open command palette"]', timeout=5000)
             page.click('button[title^="Open command palette"]')
             page.wait_for_selector('text=Available entities', timeout=5000)
         report.append({'step': 'open_palette', 'ms': round(t(),1), 'ok': True})
 
         # Run help
-        with timer() as t:
+        with step('help') as t:
             input_sel = 'div[role="dialog"] input[type="text"], div[role="dialog"] input[type="password"]'
             page.fill(input_sel, 'help')
             page.keyboard.press('Enter')
@@ -82,7 +93,7 @@ def main() -> None:
         report.append({'step': 'help', 'ms': round(t(),1), 'ok': True})
 
         # Create a company via freeform and Enter
-        with timer() as t:
+        with step('company_create') as t:
             # Ensure palette input is focused
             page.fill('div[role="dialog"] input[type="text"]', f'company create {test_company}')
             page.keyboard.press('Enter')
@@ -0,0 +1,194 @@
+"""
+Metrics — Counters, timers and histograms shared by the tools/ harnesses.
+
+What it does
+- Keeps labelled counters and histograms in memory (timers record into histograms)
+- Appends every update to a JSONL time series as it happens
+- Rewrites a Prometheus text format (0.0.4) file while the run is going, so
+  node_exporter's textfile collector (or anything tailing the file) sees live values
+
+Usage
+  from metrics import Metrics
+
+  M = Metrics('cli_suite')
+  M.inc('commands_total', action='user.create', status='200')
+  M.observe('command_duration_seconds', 0.084, action='user.create')
+  with M.time('step_duration_seconds', step='login'):
+      ...
+
+Configuration (env)
+  METRICS_DIR            output directory (default: tools/reports/metrics)
+  METRICS_FLUSH_SECONDS  minimum seconds between textfile rewrites (default: 1)
+
+Outputs
+- <METRICS_DIR>/<harness>_<run>.prom              latest values, replaced atomically;
+                                                   removed on close()
+- <METRICS_DIR>/<harness>_<timestamp>_<run>.jsonl  one line per update for this run
+
+Each process gets its own run id, so parallel runs of one harness (load/soak) write
+separate textfiles instead of overwriting each other's series. The JSONL file stays
+after the run; a killed run can leave a stale .prom behind, recognisable by its
+haasib_tool_last_update_timestamp_seconds.
+
+Notes
+- Metric names are prefixed with haasib_tool_ and carry harness/run labels, so the
+  textfiles of several harnesses can sit in one collector directory.
+- Pass counter names with their _total suffix; they are written as-is, which is what
+  the 0.0.4 format expects (this is not an OpenMetrics exposition: no # EOF, and
+  counter families keep the _total suffix).
+"""
+from __future__ import annotations
+import atexit, json, math, os, pathlib, threading, time, uuid
+from contextlib import contextmanager
+
+PREFIX = 'haasib_tool_'
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + '}'
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metrics:
+    def __init__(self, harness: str, directory: str | os.PathLike | None = None,
+                 flush_seconds: float | None = None, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.harness = harness
+        self.run_id = uuid.uuid4().hex[:8]
+        self.dir = pathlib.Path(directory or os.environ.get('METRICS_DIR', 'tools/reports/metrics'))
+        self.flush_seconds = float(flush_seconds if flush_seconds is not None else os.environ.get('METRICS_FLUSH_SECONDS', 1))
+        self.buckets = tuple(sorted(buckets))
+        self.prom_path = self.dir / f'{harness}_{self.run_id}.prom'
+        self.jsonl_path = self.dir / f"{harness}_{time.strftime('%Y%m%d_%H%M%S')}_{self.run_id}.jsonl"
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, dict]] = {}
+        self._lock = threading.Lock()
+        self._jsonl = None
+        self._last_flush = 0.0
+        self._timer: threading.Timer | None = None
+        self._closed = False
+        atexit.register(self.close)
+
+    # -- recording ---------------------------------------------------------
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+            self._emit('counter', name, labels, amount, total=series[key])
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    h['buckets'][i] += 1
+            h['sum'] += value
+            h['count'] += 1
+            self._emit('histogram', name, labels, value)
+
+    @contextmanager
+    def time(self, name: str, **labels: str):
+        """Observe the block's wall time in seconds; yields a callable returning elapsed ms."""
+        t0 = time.perf_counter()
+        try:
+            yield lambda: (time.perf_counter() - t0) * 1000.0
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    # -- export ------------------------------------------------------------
+
+    def _emit(self, kind: str, name: str, labels: dict, value: float, **extra) -> None:
+        if self._closed:
+            return
+        if self._jsonl is None:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            self._jsonl = self.jsonl_path.open('a', buffering=1)
+        row = {'ts': round(time.time(), 3), 'harness': self.harness, 'run': self.run_id,
+               'type': kind, 'metric': name, 'labels': {k: str(v) for k, v in labels.items()},
+               'value': value, **extra}
+        self._jsonl.write(json.dumps(row) + '\n')
+        wait = self._last_flush + self.flush_seconds - time.monotonic()
+        if wait <= 0:
+            self._write_textfile()
+        elif self._timer is None:
+            # Trailing write so updates inside the window show up even if nothing follows them
+            self._timer = threading.Timer(wait, self._trailing_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _trailing_flush(self) -> None:
+        with self._lock:
+            self._timer = None
+            if not self._closed:
+                self._write_textfile()
+
+    def render(self) -> str:
+        base = {'harness': self.harness, 'run': self.run_id}
+        lines: list[str] = []
+        for name, series in sorted(self._counters.items()):
+            lines.append(f'# TYPE {PREFIX}{name} counter')
+            for key, total in series.items():
+                lines.append(f'{PREFIX}{name}{_labels({**base, **dict(key)})} {_number(total)}')
+        for name, series in sorted(self._histograms.items()):
+            lines.append(f'# TYPE {PREFIX}{name} histogram')
+            for key, h in series.items():
+                labels = {**base, **dict(key)}
+                for bound, count in zip(self.buckets, h['buckets']):
+                    lines.append(f"{PREFIX}{name}_bucket{_labels({**labels, 'le': _number(bound)})} {count}")
+                lines.append(f"{PREFIX}{name}_bucket{_labels({**labels, 'le': '+Inf'})} {h['count']}")
+                lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {_number(h['sum'])}")
+                lines.append(f"{PREFIX}{name}_count{_labels(labels)} {h['count']}")
+        lines.append(f'# TYPE {PREFIX}last_update_timestamp_seconds gauge')
+        lines.append(f'{PREFIX}last_update_timestamp_seconds{_labels(base)} {_number(round(time.time(), 3))}')
+        return '\n'.join(lines) + '\n'
+
+    def _write_textfile(self) -> None:
+        # Write-then-rename: collectors must never read a half-written file
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.prom_path.with_name(f'{self.prom_path.name}.{os.getpid()}.tmp')
+        tmp.write_text(self.render())
+        os.replace(tmp, self.prom_path)
+        self._last_flush = time.monotonic()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._closed:
+                self._write_textfile()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            # The run is over; leave its series to the JSONL file rather than a frozen textfile
+            self.prom_path.unlink(missing_ok=True)
+            if self._jsonl is not None:
+                self._jsonl.close()
+            self._closed = True
+
+    def __enter__(self) -> 'Metrics':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()